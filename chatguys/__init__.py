@@ -2,12 +2,27 @@
 
 __version__ = "0.1.0"
 
-from .cli.app import ChatApp
-from .core.agent import Agent
-from .core.config import ConfigManager
-from .core.context import ContextManager
-from .cli.commands import CommandProcessor
-from .cli.input import InputHandler
+import importlib
+
+# Public classes and the modules defining them. They are imported on first
+# access so `import chatguys` (and `chatguys --help`) stays fast.
+_LAZY_EXPORTS = {
+    'ChatApp': '.cli.app',
+    'Agent': '.core.agent',
+    'ConfigManager': '.core.config',
+    'ContextManager': '.core.context',
+    'CommandProcessor': '.cli.commands',
+    'InputHandler': '.cli.input',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'ChatApp',
@@ -5,17 +5,37 @@ import sys
 import argparse
 from pathlib import Path
 import shutil
-from .cli.app import ChatApp
+from rich.console import Console
+from . import __version__
+
+
+# Console shared by all status output
+_CONSOLE = Console()
+
+# Console for unexpected errors
+_ERR_CONSOLE = Console(stderr=True)
 
 
 def ensure_config():
     """Ensure config directory and default files exist."""
     # Get user config directory
     config_dir = Path.home() / ".config" / "chatguys"
+    
+    env_file = config_dir / ".env"
+    default_config = config_dir / "default_roles.yaml"
+    
+    # Skip the checks below once this version has completed setup, as long
+    # as the files it created are still there
+    sentinel = config_dir / ".config_ok"
+    try:
+        if sentinel.read_text() == __version__ and env_file.exists() and default_config.exists():
+            return True
+    except OSError:
+        pass
+    
     config_dir.mkdir(parents=True, exist_ok=True)
     
     # Create .env file if it doesn't exist
-    env_file = config_dir / ".env"
     if not env_file.exists():
         env_file.write_text("""# OpenAI settings
 OPENAI_API_KEY=your_api_key_here
@@ -24,13 +44,22 @@ OPENAI_BASE_URL=https://api.openai.com/v1
 # Optional: Role-specific API keys
 # OPENAI_API_KEY_TECH=your_tech_role_api_key
 # OPENAI_API_KEY_CREATIVE=your_creative_role_api_key
+
+# Optional: Send messages that mention this many roles or more through the
+# Batch API (slower, but cheaper). Unset or 0 disables batching.
+# CHATGUYS_BATCH_THRESHOLD=4
+
+# Optional: Maximum number of API requests in flight at once (default 8)
+# CHATGUYS_MAX_CONCURRENCY=8
+
+# Optional: Maximum number of API requests started per minute (default unlimited)
+# CHATGUYS_REQUESTS_PER_MINUTE=60
 """)
-        print(f"\nConfiguration files created in {config_dir}")
-        print(f"Please configure your API keys in {env_file}")
+        _CONSOLE.print(f"\nConfiguration files created in {config_dir}", markup=False)
+        _CONSOLE.print(f"Please configure your API keys in {env_file}", markup=False)
         return False
     
     # Copy default config if it doesn't exist
-    default_config = config_dir / "default_roles.yaml"
     if not default_config.exists():
         pkg_config = Path(__file__).parent / "config" / "default_roles.yaml"
         if pkg_config.exists():
@@ -59,6 +88,7 @@ Creative:
   prompt: "You are a creative assistant. Think outside the box and provide imaginative responses."
 """)
     
+    sentinel.write_text(__version__)
     return True
 
 
@@ -75,18 +105,31 @@ def main():
         if not ensure_config():
             return 1
         
+        # Imported here so --help and first-run setup skip loading the
+        # OpenAI client, prompt_toolkit and the rest of the app
+        from .cli.app import ChatApp
+        
         # Create and run the app
-        app = ChatApp(session_name=args.name, load_session=args.load)
-        asyncio.run(app.run())
+        async def run_app():
+            app = await ChatApp.create(session_name=args.name, load_session=args.load)
+            await app.run()
+        
+        # Use uvloop's event loop when it is available (not on Windows)
+        try:
+            import uvloop
+        except ImportError:
+            asyncio.run(run_app())
+        else:
+            uvloop.run(run_app())
         return 0
     except KeyboardInterrupt:
-        print("\nGoodbye!")
+        _CONSOLE.print("\nGoodbye!")
         return 0
     except ValueError as e:
-        print(f"\nConfiguration Error: {str(e)}")
+        _CONSOLE.print(f"\nConfiguration Error: {str(e)}", markup=False)
         return 1
     except Exception as e:
-        print(f"\nError: {str(e)}", file=sys.stderr)
+        _ERR_CONSOLE.print(f"\nError: {str(e)}", markup=False)
         return 1
 
 
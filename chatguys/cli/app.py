@@ -3,63 +3,150 @@
 import os
 import signal
 import asyncio
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.markdown import Markdown
-from rich.status import Status
-from dotenv import load_dotenv
+from rich.live import Live
 
-from ..core.agent import Agent
+from ..core.agent import (
+    Agent, DEFAULT_CONTEXT_WINDOW, ResponseInterrupted, build_history_messages, close_clients
+)
+from ..core.batch import BatchProcessor
 from ..core.config import ConfigManager
 from ..core.context import ContextManager
+from ..core.ratelimit import RateLimiter
+from ..models.message import Message
 from ..cli.commands import CommandProcessor
+from ..cli.display import ResponseDisplay, maybe_markdown
 from ..cli.input import InputHandler
 from ..utils.text import extract_mentions, format_role_message
 
 
+# Inputs that exit the application
+_EXIT_TOKENS = frozenset({'exit', 'quit', '/quit', '/exit'})
+_EXIT_TOKEN_MAX_LEN = max(map(len, _EXIT_TOKENS))
+
+# Older messages are summarized once this many have left the window
+_SUMMARY_BATCH = 10
+
+# Messages longer than this are parsed for mentions in a worker thread
+_THREADED_PARSE_MIN_LEN = 4096
+
+# Whether the .env file has already been loaded in this process
+_ENV_LOADED = False
+
+
+def _load_environment() -> Path:
+    """Load the .env file from the config directory (once per process).
+    
+    A missing file or OPENAI_API_KEY raises ValueError.
+    
+    Returns:
+        Path: The .env file
+    """
+    global _ENV_LOADED
+    
+    # Get config directory
+    config_dir = Path.home() / ".config" / "chatguys"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Load environment variables from config directory
+    env_file = config_dir / ".env"
+    if not env_file.exists():
+        raise ValueError(f"API keys not configured. Please edit {env_file}")
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        print(f"Loading environment variables from {env_file}")
+        load_dotenv(env_file, override=True)
+        _ENV_LOADED = True
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError(f"OPENAI_API_KEY not set in {env_file}")
+    return env_file
+
+
+def _open_session(session_name: str = None, load_session: str = None) -> ContextManager:
+    """Create the context manager and load the requested session.
+    
+    Args:
+        session_name (str, optional): Custom name for the chat session files
+        load_session (str, optional): Name of a previous session to load
+        
+    Returns:
+        ContextManager: Context manager for the session
+    """
+    # Initialize context manager with session name
+    context_manager = ContextManager(session_name=load_session or session_name)
+    
+    # Try to load previous session if requested
+    if load_session:
+        if not context_manager.load_history(load_session):
+            print(f"Warning: Could not load session '{load_session}'")
+    elif session_name:
+        # Create new session with custom name
+        context_manager.load_history(session_name)
+    return context_manager
+
+
 class ChatApp:
     """Main chat application class."""
     
-    def __init__(self, session_name: str = None, load_session: str = None):
-        """Initialize the chat application.
+    @classmethod
+    async def create(cls, session_name: str = None, load_session: str = None) -> "ChatApp":
+        """Create the chat application, reading configuration and history concurrently.
+        
+        Role configuration and the session file are independent disk reads,
+        so they are loaded in worker threads at the same time.
         
         Args:
             session_name (str, optional): Custom name for the chat session files
             load_session (str, optional): Name of a previous session to load
+            
+        Returns:
+            ChatApp: The initialized application
         """
-        # Get config directory
-        self.config_dir = Path.home() / ".config" / "chatguys"
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Load environment variables from config directory
-        env_file = self.config_dir / ".env"
-        if not env_file.exists():
-            raise ValueError(f"API keys not configured. Please edit {env_file}")
-        print(f"Loading environment variables from {env_file}")
-        load_dotenv(env_file, override=True)
+        # Settings in .env are needed by both, so load them first
+        config_dir = _load_environment().parent
+        config_manager, context_manager = await asyncio.gather(
+            asyncio.to_thread(ConfigManager),
+            asyncio.to_thread(_open_session, session_name, load_session)
+        )
+        return cls(
+            session_name,
+            load_session,
+            config_manager=config_manager,
+            context_manager=context_manager,
+            config_dir=config_dir
+        )
+    
+    def __init__(
+        self,
+        session_name: str = None,
+        load_session: str = None,
+        config_manager: Optional[ConfigManager] = None,
+        context_manager: Optional[ContextManager] = None,
+        config_dir: Optional[Path] = None
+    ):
+        """Initialize the chat application.
         
-        # Store default OpenAI settings
+        Args:
+            session_name (str, optional): Custom name for the chat session files
+            load_session (str, optional): Name of a previous session to load
+            config_manager (ConfigManager, optional): Already loaded configuration
+            context_manager (ContextManager, optional): Already loaded session
+            config_dir (Path, optional): Config directory whose .env is already loaded
+        """
+        # Load environment variables (unless create() already did) and
+        # store default OpenAI settings
+        self.config_dir = config_dir or _load_environment().parent
         self.default_api_key = os.getenv("OPENAI_API_KEY")
         self.default_base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
         
-        if not self.default_api_key:
-            raise ValueError(f"OPENAI_API_KEY not set in {env_file}")
-        
         # Initialize core components
-        self.config_manager = ConfigManager()
-        
-        # Initialize context manager with session name
-        session_name_to_use = load_session or session_name
-        self.context_manager = ContextManager(session_name=session_name_to_use)
-        
-        # Try to load previous session if requested
-        if load_session:
-            if not self.context_manager.load_history(load_session):
-                print(f"Warning: Could not load session '{load_session}'")
-        elif session_name:
-            # Create new session with custom name
-            self.context_manager.load_history(session_name)
+        self.config_manager = config_manager or ConfigManager()
+        self.context_manager = context_manager or _open_session(session_name, load_session)
         
         # Initialize CLI components
         self.command_processor = CommandProcessor(
@@ -71,78 +158,366 @@ class ChatApp:
             self.command_processor
         )
         
+        # Agents by role name; /reload rebuilds those whose config changed
+        self._agent_cache: Dict[str, Agent] = {}
+        self.command_processor.add_reload_callback(self.invalidate_agents)
+        
+        # Messages older than the smallest role window go into the summary
+        self._refresh_summary_window()
+        self.command_processor.add_reload_callback(self._refresh_summary_window)
+        
+        # Caps concurrent API requests; resized when /concurrency changes the limit
+        self._sem_limit = self.config_manager.max_concurrency
+        self._sem = asyncio.Semaphore(self._sem_limit)
+        
+        # Spreads requests out to stay under the provider's rate limit
+        rpm = self.config_manager.requests_per_minute
+        self._rate_limiter = RateLimiter(rpm) if rpm > 0 else None
+        
         # Flag for graceful shutdown and response cancellation
         self.should_exit = False
         self.current_task = None
+        self.run_task = None
+        self.summary_task = None
+    
+    def _get_agent(self, role_name: str) -> Optional[Agent]:
+        """Get the agent for a role, creating it on first use.
+        
+        Args:
+            role_name (str): Name of the role
+            
+        Returns:
+            Optional[Agent]: The agent, or None if the role is not configured
+        """
+        agent = self._agent_cache.get(role_name)
+        if agent is None:
+            role_config = self.config_manager.get_role_config(role_name)
+            if not role_config:
+                return None
+            agent = Agent(
+                role_name,
+                role_config,
+                self.default_api_key,
+                self.default_base_url
+            )
+            self._agent_cache[role_name] = agent
+        return agent
+    
+    def invalidate_agents(self) -> None:
+        """Drop cached agents whose configuration changed on reload.
+        
+        Agents for unchanged roles are kept, along with their clients and
+        connections, so a reload only pays for what it actually changed.
+        """
+        for role_name, agent in list(self._agent_cache.items()):
+            if self.config_manager.get_role_config(role_name) != agent.config:
+                del self._agent_cache[role_name]
     
-    def _handle_signal(self, signum, frame):
+    def _refresh_summary_window(self) -> None:
+        """Base the summary on the smallest context window of any role.
+        
+        Messages are summarized once they leave that window; until then they
+        are sent verbatim to every role, even past its own window. Roles with
+        larger windows see the overlap both verbatim and in the summary.
+        """
+        windows = []
+        for role_config in self.config_manager.roles.values():
+            try:
+                windows.append(int(role_config.get('model', {}).get('context_window', DEFAULT_CONTEXT_WINDOW)))
+            except (AttributeError, TypeError, ValueError):
+                # Broken role configs are reported when the role is used
+                continue
+        self._summary_window = min(windows, default=DEFAULT_CONTEXT_WINDOW)
+    
+    def _install_signal_handlers(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Install SIGINT/SIGTERM handlers on the event loop.
+        
+        prompt_toolkit replaces the SIGINT handler while a prompt is active
+        and removes it afterwards, so this is called again after each prompt.
+        
+        Args:
+            loop (asyncio.AbstractEventLoop): The running event loop
+        """
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._handle_signal_async)
+            except NotImplementedError:
+                # Event loop signal handlers are not available on Windows
+                signal.signal(sig, lambda signum, frame: self._handle_signal_async())
+    
+    def _handle_signal_async(self) -> None:
         """Handle system signals for graceful shutdown."""
         if self.current_task and not self.current_task.done():
             # Cancel current response task
             self.current_task.cancel()
         else:
-            self.input_handler.display_message(
-                "\nReceived shutdown signal. Use 'exit' or 'quit' to exit properly."
-            )
+            self.input_handler.display_message("\nReceived shutdown signal.")
             self.should_exit = True
+            if self.run_task and not self.run_task.done():
+                # Stop waiting for input
+                self.run_task.cancel()
     
     async def _process_agent_response(
-        self, role_name: str, message: str, status: Status
+        self,
+        role_name: str,
+        message: str,
+        status: ResponseDisplay,
+        history_messages: List[Dict[str, str]]
     ) -> Tuple[str, str]:
         """Process a single agent's response.
         
         Args:
             role_name (str): Name of the role to use
             message (str): Message for this role
-            status (Status): Status indicator to update
+            status (ResponseDisplay): Live display to update and stream into
+            history_messages (List[Dict[str, str]]): Conversation context
+                for this role's context window
             
         Returns:
             Tuple[str, str]: (role_name, response)
         """
         try:
-            # Get role configuration
-            status.update(f"[bold blue]{role_name}[/]: Loading role configuration...")
-            role_config = self.config_manager.get_role_config(role_name)
-            if not role_config:
+            # Get the (cached) agent for this role
+            status.set_phase(role_name, "Loading agent...")
+            agent = self._get_agent(role_name)
+            if agent is None:
                 return role_name, f"Error: Role '{role_name}' not found."
             
-            # Create agent instance
-            status.update(f"[bold blue]{role_name}[/]: Initializing agent...")
-            agent = Agent(
-                role_name,
-                role_config,
-                self.default_api_key,
-                self.default_base_url
-            )
-            
             # Update status for context preparation
-            status.update(f"[bold blue]{role_name}[/]: Preparing context ({len(self.context_manager.get_history())} messages)...")
+            status.set_phase(role_name, f"Preparing context ({len(history_messages)} messages)...")
             
-            # Get response
-            status.update(f"[bold blue]{role_name}[/]: Waiting for API response...")
-            response = await agent.get_response(
-                message,
-                self.context_manager.get_history()
-            )
+            # Stream the response into the live display once a slot is free
+            if self._sem.locked():
+                status.set_phase(role_name, "Queued...")
+            async with self._sem:
+                if self._rate_limiter:
+                    status.set_phase(role_name, "Waiting for rate limit...")
+                    await self._rate_limiter.acquire()
+                status.set_phase(role_name, "Waiting for API response...")
+                chunks = []
+                interrupted = None
+                try:
+                    async for chunk in agent.stream_response(message, history_messages):
+                        chunks.append(chunk)
+                        status.append(role_name, chunk)
+                except ResponseInterrupted as e:
+                    interrupted = str(e)
+            response = "".join(chunks)
             
-            # Add response to history
-            status.update(f"[bold blue]{role_name}[/]: Saving response...")
-            self.context_manager.add_message(role_name, response)
-            
-            return role_name, response
+            # Add response to history; an error that cut it short is
+            # recorded separately rather than as part of the response
+            status.set_phase(role_name, "Saving response...")
+            if interrupted is None:
+                self.context_manager.add_message(role_name, response)
+                return role_name, response
+            self.context_manager.add_messages([
+                (role_name, response),
+                ("system", f"Response from {role_name} was cut short. {interrupted}")
+            ])
+            return role_name, f"{response}\n\n{interrupted}"
         except asyncio.CancelledError:
-            status.update(f"[bold red]{role_name}[/]: Cancelling...")
+            status.set_phase(role_name, "[red]Cancelling...[/]")
             raise
         except Exception as e:
             error_msg = f"Error from {role_name}: {str(e)}"
             self.context_manager.add_message("system", error_msg)
             return role_name, error_msg
     
+    def _display_response(self, role_name: str, response: str, status: ResponseDisplay) -> None:
+        """Print a finished response above the live display.
+        
+        Args:
+            role_name (str): Name of the role
+            response (str): The complete response
+            status (ResponseDisplay): Live display showing the partial response
+        """
+        status.discard(role_name)
+        
+        # Buffer the console so the response is written in one go
+        with self.input_handler.console:
+            self.input_handler.display_message(f"\n[bold]{role_name}[/bold]:")
+            self.input_handler.display_message(maybe_markdown(response))
+    
+    async def _gather_responses(
+        self, roles_and_messages: List[Tuple[str, str]], status: ResponseDisplay
+    ) -> List[Tuple[str, str]]:
+        """Get responses from all mentioned roles concurrently.
+        
+        Each response is displayed as soon as it completes.
+        
+        Args:
+            roles_and_messages (List[Tuple[str, str]]): (role_name, message) pairs
+            status (ResponseDisplay): Live display to update and stream into
+            
+        Returns:
+            List[Tuple[str, str]]: (role_name, response) pairs in mention order
+        """
+        # Add user messages to history in one batch
+        turn_size = len(roles_and_messages)
+        self.context_manager.add_messages([
+            ("user", format_role_message(role_name, clean_message))
+            for role_name, clean_message in roles_and_messages
+        ])
+        history = self.context_manager.get_history()
+        earlier, turn_messages = history[:-turn_size], history[-turn_size:]
+        
+        # Every role sees the same earlier history, converted once per window
+        # size; only its share of this turn differs. Its own message is left
+        # out, since it is sent as the final user message instead, and what
+        # the other roles were just asked counts toward its window.
+        summary = self.context_manager.summary
+        
+        # Messages the summary doesn't cover yet are always sent verbatim,
+        # even beyond the window, so none falls between the two
+        until = self.context_manager.summary_until
+        unsummarized = (
+            bisect_right(earlier, until, key=lambda msg: msg.timestamp)
+            if until is not None else 0
+        )
+        by_window: Dict[int, List[Dict[str, str]]] = {}
+        turn_chat = [msg.as_chat_message() for msg in turn_messages]
+        contexts = []
+        for i, (role_name, _) in enumerate(roles_and_messages):
+            try:
+                agent = self._get_agent(role_name)
+            except Exception:
+                # A broken role config fails only that role's own request
+                agent = None
+            window = agent.context_window if agent else DEFAULT_CONTEXT_WINDOW
+            if window not in by_window:
+                keep = max(0, window - (turn_size - 1))
+                by_window[window] = build_history_messages(
+                    earlier[min(max(0, len(earlier) - keep), unsummarized):], summary
+                )
+            siblings = turn_chat[:i] + turn_chat[i + 1:]
+            contexts.append(by_window[window] + siblings[max(0, len(siblings) - window):])
+        
+        # Large fan-outs can go through the Batch API when enabled
+        threshold = self.config_manager.batch_threshold
+        if threshold and len(roles_and_messages) >= threshold:
+            responses = await self._batch_responses(roles_and_messages, status, contexts)
+            if responses is not None:
+                for role_name, response in responses:
+                    self._display_response(role_name, response, status)
+                return responses
+        
+        # Pick up a limit changed with /concurrency since the last turn
+        if self._sem_limit != self.config_manager.max_concurrency:
+            self._sem_limit = self.config_manager.max_concurrency
+            self._sem = asyncio.Semaphore(self._sem_limit)
+        
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(
+                    self._process_agent_response(
+                        role_name, clean_message, status, history_messages
+                    )
+                )
+                for (role_name, clean_message), history_messages
+                in zip(roles_and_messages, contexts)
+            ]
+            
+            # Show each response as soon as it is ready
+            for next_done in asyncio.as_completed(tasks):
+                role_name, response = await next_done
+                self._display_response(role_name, response, status)
+        return [task.result() for task in tasks]
+    
+    async def _batch_responses(
+        self,
+        roles_and_messages: List[Tuple[str, str]],
+        status: ResponseDisplay,
+        contexts: List[List[Dict[str, str]]]
+    ) -> Optional[List[Tuple[str, str]]]:
+        """Get responses from all mentioned roles with one Batch API job.
+        
+        Args:
+            roles_and_messages (List[Tuple[str, str]]): (role_name, message) pairs
+            status (ResponseDisplay): Live display to update
+            contexts (List[List[Dict[str, str]]]): Conversation context for
+                each role, in the same order
+            
+        Returns:
+            Optional[List[Tuple[str, str]]]: (role_name, response) pairs in
+                mention order, or None if the roles can't share a batch
+        """
+        # A batch needs every role on the same provider and model; roles
+        # that can't be built are left to report their own errors
+        try:
+            agents = [self._get_agent(role_name) for role_name, _ in roles_and_messages]
+        except Exception:
+            return None
+        if any(agent is None for agent in agents):
+            return None
+        if any(
+            agent.client is not agents[0].client or
+            agent.config['model']['engine'] != agents[0].config['model']['engine']
+            for agent in agents
+        ):
+            return None
+        
+        status.update(f"[bold blue]Batch[/]: Waiting for {len(agents)} responses...")
+        requests = [
+            agent.build_request(clean_message, history_messages)
+            for agent, (_, clean_message), history_messages
+            in zip(agents, roles_and_messages, contexts)
+        ]
+        try:
+            texts = await BatchProcessor(agents[0].client).run_batch(requests)
+        except Exception as e:
+            error_msg = f"Error from batch: {str(e)}"
+            self.context_manager.add_message("system", error_msg)
+            return [(role_name, error_msg) for role_name, _ in roles_and_messages]
+        
+        responses = [
+            (role_name, text)
+            for (role_name, _), text in zip(roles_and_messages, texts)
+        ]
+        self.context_manager.add_messages(responses)
+        return responses
+    
+    def _schedule_summary(self) -> None:
+        """Summarize older history in the background once enough has built up."""
+        if self.summary_task and not self.summary_task.done():
+            return
+        pending = self.context_manager.get_unsummarized(self._summary_window)
+        if len(pending) >= _SUMMARY_BATCH:
+            self.summary_task = asyncio.create_task(self._update_summary(pending))
+    
+    async def _update_summary(self, messages: List[Message]) -> None:
+        """Fold messages into the conversation summary using the Default role.
+        
+        Args:
+            messages (List[Message]): Messages that left the prompt window
+        """
+        try:
+            agent = self._get_agent("Default")
+            if agent is None:
+                return
+            if self._rate_limiter:
+                await self._rate_limiter.acquire()
+            summary = await agent.summarize(messages, self.context_manager.summary)
+        except Exception:
+            # Keep the previous summary; this is retried after the next turn
+            return
+        
+        # Skip if the history was cleared while summarizing
+        if summary and any(msg is messages[-1] for msg in self.context_manager.get_history()):
+            self.context_manager.update_summary(summary, messages[-1].timestamp)
+    
     async def run(self):
         """Run the chat application."""
+        # Look up the running loop once for the whole session
+        loop = asyncio.get_running_loop()
+        
         # Set up signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._handle_signal)
-        signal.signal(signal.SIGTERM, self._handle_signal)
+        self.run_task = asyncio.current_task()
+        self._install_signal_handlers(loop)
+        
+        # Start tasks eagerly so agents that finish without blocking
+        # (e.g. unknown roles) skip a round trip through the scheduler
+        if hasattr(asyncio, 'eager_task_factory'):  # Python 3.12+
+            loop.set_task_factory(asyncio.eager_task_factory)
         
         # Display welcome message
         self.input_handler.display_message(Markdown("# Welcome to ChatGuys!"))
@@ -154,124 +529,107 @@ class ChatApp:
         )
         self.input_handler.display_message("Type /help for available commands.")
         
-        while not self.should_exit:
-            try:
-                # Get user input
-                message = await self.input_handler.get_input()
-                
-                # Skip empty messages
-                if not message.strip():
-                    continue
-                
-                # Handle exit command
-                if message.lower() in ['exit', 'quit', '/quit', '/exit']:
-                    quit_message = self.command_processor.cmd_quit()
-                    self.input_handler.display_message(quit_message)
-                    break
-                
-                # Process the message
-                if self.command_processor.is_command(message):
-                    # Handle system command
-                    response = self.command_processor.process_command(message)
-                    self.input_handler.display_message(Markdown(response))
-                else:
-                    # Extract all roles and their messages
-                    roles_and_messages = extract_mentions(message)
+        try:
+            while not self.should_exit:
+                try:
+                    # Get user input
+                    try:
+                        message = await self.input_handler.get_input()
+                    finally:
+                        self._install_signal_handlers(loop)
                     
-                    # Skip if no valid messages
-                    if not roles_and_messages:
+                    # Skip empty messages (input is already stripped)
+                    if not message:
                         continue
                     
-                    # Add user message to history
-                    for role_name, clean_message in roles_and_messages:
-                        context_message = format_role_message(role_name, clean_message)
-                        self.context_manager.add_message("user", context_message)
+                    # Handle exit command; only short inputs can match
+                    if len(message) <= _EXIT_TOKEN_MAX_LEN and message.lower() in _EXIT_TOKENS:
+                        quit_message = self.command_processor.cmd_quit()
+                        self.input_handler.display_message(quit_message)
+                        break
                     
-                    try:
-                        # Create status indicator
-                        with Status("Starting response generation...", spinner="dots") as status:
-                            # Create tasks for each role's response
-                            tasks = [
-                                asyncio.create_task(
-                                    self._process_agent_response(role_name, clean_message, status)
+                    # Process the message
+                    if self.command_processor.is_command(message):
+                        # Handle system command
+                        response = self.command_processor.process_command(message)
+                        self.input_handler.display_message(maybe_markdown(response))
+                    else:
+                        # Extract all roles and their messages; long pastes are
+                        # parsed in a thread to keep background work responsive
+                        if len(message) > _THREADED_PARSE_MIN_LEN:
+                            roles_and_messages = await asyncio.to_thread(extract_mentions, message)
+                        else:
+                            roles_and_messages = extract_mentions(message)
+                        
+                        # Skip if no valid messages
+                        if not roles_and_messages:
+                            continue
+                        
+                        try:
+                            # Create a live display for status and streamed responses;
+                            # finished responses are printed above it
+                            status = ResponseDisplay("Starting response generation...")
+                            with Live(
+                                status,
+                                console=self.input_handler.console,
+                                refresh_per_second=8,
+                                transient=True
+                            ):
+                                # Store the response task for cancellation
+                                self.current_task = asyncio.create_task(
+                                    self._gather_responses(roles_and_messages, status)
                                 )
-                                for role_name, clean_message in roles_and_messages
-                            ]
-                            
-                            # Store the gathering task for cancellation
-                            self.current_task = asyncio.gather(*tasks)
-                            
-                            try:
-                                # Wait for all responses
-                                responses = await self.current_task
                                 
-                                # Display responses in original order
-                                for role_name, response in responses:
-                                    self.input_handler.display_message(
-                                        f"\n[bold]{role_name}[/bold]:"
-                                    )
-                                    self.input_handler.display_message(Markdown(response))
-                            except asyncio.CancelledError:
-                                # Response was cancelled by Ctrl+C
-                                self.input_handler.display_message("\n[bold red]Cancelling responses...[/]")
-                                
-                                # Cancel all tasks and wait for them to finish
-                                for task in tasks:
-                                    if not task.done():
-                                        task.cancel()
-                                
-                                # Wait for all tasks to complete cancellation
                                 try:
-                                    await asyncio.wait(tasks, timeout=5.0)
-                                except asyncio.TimeoutError:
-                                    self.input_handler.display_message("[red]Force cancelling tasks...[/]")
-                                
-                                # Add cancellation to history
-                                self.context_manager.add_message(
-                                    "system",
-                                    "Response generation was cancelled by user"
-                                )
-                                self.input_handler.display_message("\n[green]Cancelled successfully.[/]")
-                            finally:
-                                self.current_task = None
-                                
-                                # Clean up any remaining tasks
-                                for task in tasks:
-                                    if not task.done():
-                                        task.cancel()
-                    
-                    except Exception as e:
-                        error_msg = f"Error getting responses: {str(e)}"
-                        self.input_handler.display_error(error_msg)
-                        self.context_manager.add_message("system", error_msg)
-            
-            except asyncio.CancelledError:
-                # Handle cancellation gracefully
-                if self.current_task and not self.current_task.done():
-                    self.current_task.cancel()
-                    self.input_handler.display_message("\n[bold red]Cancelling...[/]")
-                    try:
-                        await asyncio.wait_for(self.current_task, timeout=5.0)
-                    except (asyncio.TimeoutError, asyncio.CancelledError):
-                        pass
-                quit_message = self.command_processor.cmd_quit()
-                self.input_handler.display_message(f"\n{quit_message}")
-                break
-            except KeyboardInterrupt:
-                # Handle Ctrl+C gracefully
-                if self.current_task and not self.current_task.done():
-                    self.current_task.cancel()
-                    self.input_handler.display_message("\n[bold red]Cancelling response...[/]")
-                    try:
-                        await asyncio.wait_for(self.current_task, timeout=5.0)
-                        self.input_handler.display_message("[green]Cancelled successfully.[/]")
-                    except (asyncio.TimeoutError, asyncio.CancelledError):
-                        self.input_handler.display_message("[red]Force cancelled.[/]")
-                else:
+                                    # Wait for all responses; each is displayed as it arrives
+                                    await self.current_task
+                                except asyncio.CancelledError:
+                                    # Response was cancelled by Ctrl+C; the task group
+                                    # cancels and awaits every agent before this point
+                                    self.input_handler.display_message("\n[bold red]Cancelling responses...[/]")
+                                    
+                                    # Add cancellation to history
+                                    self.context_manager.add_message(
+                                        "system",
+                                        "Response generation was cancelled by user"
+                                    )
+                                    self.input_handler.display_message("\n[green]Cancelled successfully.[/]")
+                                finally:
+                                    self.current_task = None
+                            
+                            # Condense messages that no longer fit the prompt window
+                            self._schedule_summary()
+                        
+                        except Exception as e:
+                            error_msg = f"Error getting responses: {str(e)}"
+                            self.input_handler.display_error(error_msg)
+                            self.context_manager.add_message("system", error_msg)
+                
+                except asyncio.CancelledError:
+                    # Shutdown signal while waiting for input. Responses are
+                    # cancelled through their task group before this point.
+                    quit_message = self.command_processor.cmd_quit()
+                    self.input_handler.display_message(f"\n{quit_message}")
+                    break
+                except KeyboardInterrupt:
+                    # Ctrl+C at the prompt (prompt_toolkit raises it there)
                     self.input_handler.display_message(
                         "\nUse 'exit' or 'quit' to exit the application."
                     )
-            except Exception as e:
-                error_msg = str(e)
-                self.input_handler.display_error(error_msg)
-                self.context_manager.add_message("system", error_msg) 
\ No newline at end of file
+                except Exception as e:
+                    error_msg = str(e)
+                    self.input_handler.display_error(error_msg)
+                    self.context_manager.add_message("system", error_msg)
+            
+        finally:
+            await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Stop background work, save the history and release pooled HTTP connections."""
+        if self.summary_task and not self.summary_task.done():
+            self.summary_task.cancel()
+            await asyncio.gather(self.summary_task, return_exceptions=True)
+        try:
+            self.context_manager.close()
+        finally:
+            await close_clients() 
\ No newline at end of file
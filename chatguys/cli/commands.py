@@ -1,6 +1,6 @@
 """Command processing for the chat application."""
 
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from rich.markdown import Markdown
 
 from ..core.context import ContextManager
@@ -24,39 +24,57 @@ class CommandProcessor:
             '/reset': self.cmd_reset,
             '/reload': self.cmd_reload,
             '/roles': self.cmd_roles,
+            '/concurrency': self.cmd_concurrency,
             '/quit': self.cmd_quit,
             '/exit': self.cmd_quit,
         }
+        
+        # Command names never change after construction
+        self.command_names: Tuple[str, ...] = tuple(self.commands)
+        
+        # Called after configurations are reloaded
+        self._reload_callbacks: List[Callable[[], None]] = []
+    
+    def add_reload_callback(self, callback: Callable[[], None]) -> None:
+        """Register a callback to run after /reload.
+        
+        Args:
+            callback (Callable[[], None]): Function to call after reloading
+        """
+        self._reload_callbacks.append(callback)
     
     def is_command(self, message: str) -> bool:
         """Check if a message is a system command.
         
         Args:
-            message (str): The message to check
+            message (str): The message to check, already stripped
             
         Returns:
             bool: True if the message is a command, False otherwise
         """
-        return message.strip().startswith('/')
+        return message[:1] == '/'
     
     def process_command(self, command: str) -> str:
         """Process a system command and return the response.
         
         Args:
-            command (str): The command to process
+            command (str): The command to process, already stripped
             
         Returns:
             str: The command response
         """
-        # Split command and arguments
-        parts = command.strip().split()
-        cmd = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
-        
-        if cmd in self.commands:
-            return self.commands[cmd](*args)
-        else:
+        # Split off the command name at any whitespace; only the rest is
+        # split into arguments
+        head, *rest = command.split(None, 1)
+        cmd = head.lower()
+        
+        # Command table keys are all lowercase
+        handler = self.commands.get(cmd)
+        if handler is None:
             return f"Unknown command: {cmd}. Type /help for available commands."
+        if not rest:
+            return handler()
+        return handler(*rest[0].split())
     
     def cmd_help(self, *args) -> str:
         """Show help information.
@@ -69,6 +87,7 @@ class CommandProcessor:
 /reset - Clear conversation history
 /reload - Reload agent configurations
 /roles - List available roles
+/concurrency [N] - Show or set the maximum number of concurrent requests
 /quit or /exit - Exit the application
 
 To send a message to a specific agent, use @RoleName at the start of your message.
@@ -94,6 +113,8 @@ Example: @Tech @Default @Creative how would you describe the internet?"""
         """
         try:
             self.config_manager.load_configurations()
+            for callback in self._reload_callbacks:
+                callback()
             return "Agent configurations have been reloaded."
         except Exception as e:
             return f"Error reloading configurations: {str(e)}"
@@ -120,6 +141,25 @@ Example: @Tech @Default @Creative how would you describe the internet?"""
         
         return "Available roles:\n\n" + "\n\n".join(role_descriptions)
     
+    def cmd_concurrency(self, *args) -> str:
+        """Show or set the maximum number of concurrent API requests.
+        
+        Returns:
+            str: Current limit or confirmation message
+        """
+        if not args:
+            return f"Maximum concurrent requests: {self.config_manager.max_concurrency}"
+        
+        try:
+            limit = int(args[0])
+        except ValueError:
+            return f"Invalid value: {args[0]}. Usage: /concurrency N"
+        if limit < 1:
+            return "Concurrency must be at least 1."
+        
+        self.config_manager.max_concurrency = limit
+        return f"Maximum concurrent requests set to {limit}."
+    
     def cmd_quit(self, *args) -> str:
         """Quit the application.
         
@@ -128,4 +168,4 @@ Example: @Tech @Default @Creative how would you describe the internet?"""
         """
         log_file = self.context_manager.session_file
         text_file = self.context_manager.text_file
-        return f"Goodbye! Your chat history has been saved to:\n- JSON: {log_file}\n- Text: {text_file}" 
\ No newline at end of file
+        return f"Goodbye! Your chat history has been saved to:\n- JSONL: {log_file}\n- Text: {text_file}" 
\ No newline at end of file
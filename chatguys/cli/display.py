@@ -0,0 +1,95 @@
+"""Live display of streaming agent responses."""
+
+import re
+from typing import Dict
+from rich.console import Group, RenderableType
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.spinner import Spinner
+from rich.text import Text
+
+
+# Anything Markdown would render differently from plain text: inline
+# markers, line breaks, entities/HTML and list items
+_MARKDOWN_RE = re.compile(r'[\n#*`_\[\]<>|\\~&]|^\s*(?:[-+]|\d+[.)])(?:\s|$)')
+
+
+def maybe_markdown(text: str) -> RenderableType:
+    """Wrap text in Markdown only if it uses any Markdown syntax.
+    
+    Args:
+        text (str): Text to display
+        
+    Returns:
+        RenderableType: Markdown for formatted text, plain Text otherwise
+    """
+    if _MARKDOWN_RE.search(text):
+        return Markdown(text)
+    return Text(text)
+
+
+class ResponseDisplay:
+    """Renders a status line, each role's progress and its streaming response.
+    
+    Meant to be shown with ``rich.live.Live``, which re-renders it on every
+    refresh, so updates are cheap and drawing is paced by the refresh rate.
+    Concurrent roles each get their own progress line instead of
+    overwriting a shared status.
+    """
+    
+    def __init__(self, status: str = ""):
+        """Initialize the ResponseDisplay.
+        
+        Args:
+            status (str): Initial status text
+        """
+        self.spinner = Spinner("dots", text=status)
+        self.phases: Dict[str, str] = {}
+        self.buffers: Dict[str, str] = {}
+    
+    def update(self, status: str) -> None:
+        """Update the status text.
+        
+        Args:
+            status (str): New status text (may contain rich markup)
+        """
+        self.spinner.update(text=status)
+    
+    def set_phase(self, role_name: str, phase: str) -> None:
+        """Set what a role is currently doing.
+        
+        Args:
+            role_name (str): Name of the role
+            phase (str): Progress text (may contain rich markup)
+        """
+        self.phases[role_name] = phase
+    
+    def append(self, role_name: str, chunk: str) -> None:
+        """Append a streamed chunk to a role's response.
+        
+        Args:
+            role_name (str): Name of the role
+            chunk (str): Text received from the agent
+        """
+        self.buffers[role_name] = self.buffers.get(role_name, "") + chunk
+    
+    def discard(self, role_name: str) -> None:
+        """Stop showing a role's progress and partial response.
+        
+        Args:
+            role_name (str): Name of the role
+        """
+        self.phases.pop(role_name, None)
+        self.buffers.pop(role_name, None)
+    
+    def __rich__(self) -> RenderableType:
+        """Render the status line, role progress and partial responses."""
+        phases = [
+            Text.from_markup(f"  [bold blue]{role_name}[/]: {phase}")
+            for role_name, phase in list(self.phases.items())
+        ]
+        panels = [
+            Panel(Markdown(text), title=f"[bold]{role_name}[/bold]", title_align="left")
+            for role_name, text in list(self.buffers.items())
+        ]
+        return Group(self.spinner, *phases, *panels)
@@ -1,8 +1,10 @@
 """Input handling for the chat application."""
 
+from typing import Optional, Tuple
 from prompt_toolkit import PromptSession
+from prompt_toolkit.completion import WordCompleter
 from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.history import FileHistory
+from prompt_toolkit.history import FileHistory, ThreadedHistory
 from pathlib import Path
 from rich.console import Console
 
@@ -29,19 +31,38 @@ class InputHandler:
         history_dir.mkdir(parents=True, exist_ok=True)
         history_file = history_dir / "command_history.txt"
         
-        # Create prompt session with history
-        self.session = PromptSession(history=FileHistory(str(history_file)))
+        # Create prompt session with history, loaded in a background thread
+        # so a long history file doesn't delay the first prompt
+        self.session = PromptSession(history=ThreadedHistory(FileHistory(str(history_file))))
         self.console = Console()
+        
+        # Completer and the (roles, commands) it was built from
+        self._completer: Optional[WordCompleter] = None
+        self._completer_key: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+        
+        # Role names, refreshed after /reload
+        self._roles_snapshot: Optional[Tuple[str, ...]] = None
+        self.command_processor.add_reload_callback(self.invalidate_completer)
+    
+    def invalidate_completer(self) -> None:
+        """Re-read role names before the next prompt."""
+        self._roles_snapshot = None
     
     def _get_completer(self):
         """Get the combined completer for roles and commands.
         
+        The completer is only rebuilt when the role or command names change.
+        
         Returns:
             WordCompleter: Combined completer
         """
-        roles = self.config_manager.list_roles()
-        commands = list(self.command_processor.commands.keys())
-        return create_combined_completer(roles, commands)
+        if self._roles_snapshot is None:
+            self._roles_snapshot = tuple(self.config_manager.list_roles())
+        key = (self._roles_snapshot, self.command_processor.command_names)
+        if key != self._completer_key:
+            self._completer = create_combined_completer(list(key[0]), list(key[1]))
+            self._completer_key = key
+        return self._completer
     
     async def get_input(self) -> str:
         """Get user input with completion support.
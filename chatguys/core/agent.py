@@ -1,13 +1,146 @@
 """Core agent functionality."""
 
-import os
 import asyncio
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Tuple, List
+import httpx
 import openai
 from openai import AsyncOpenAI
 from ..models.message import Message
 
 
+# Number of recent messages sent verbatim when a role doesn't set
+# model.context_window; older ones are covered by the summary
+DEFAULT_CONTEXT_WINDOW = 20
+
+# Seconds allowed for a complete response
+_RESPONSE_TIMEOUT = 30
+
+# Seconds allowed between the request being accepted and the first piece
+# of the response arriving
+_FIRST_TOKEN_TIMEOUT = 15
+
+# Returned when a response does not complete in time
+_TIMEOUT_MESSAGE = f"Error: Response timeout after {_RESPONSE_TIMEOUT} seconds"
+
+# Returned when a response does not start in time
+_FIRST_TOKEN_TIMEOUT_MESSAGE = (
+    f"Error: No response within {_FIRST_TOKEN_TIMEOUT} seconds of the request being accepted"
+)
+
+# Explains the conversation format to every agent; appended to each
+# role's prompt so both travel in a single system message
+_SYSTEM_CONTEXT_NOTE = (
+    "The conversation history includes context about who messages are addressed to. "
+    "Pay attention to the conversation flow and context when responding."
+)
+
+# Instructions for condensing older conversation into a summary
+_SUMMARY_INSTRUCTION = {
+    "role": "system",
+    "content": "Summarize the following conversation between a user and several assistant roles. "
+               "Keep facts, decisions, open questions and who said what. Be concise."
+}
+
+# Token budget for conversation summaries
+_SUMMARY_MAX_TOKENS = 500
+
+# Connection pool for the HTTP client shared by all OpenAI clients
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+# Fail fast on unreachable hosts; reads may take as long as a response
+_HTTP_TIMEOUT = httpx.Timeout(float(_RESPONSE_TIMEOUT), connect=5.0)
+
+# Retries for rate-limited (429), failed (5xx) and dropped requests. The
+# OpenAI client backs off exponentially with jitter and honours
+# Retry-After; the response deadline still caps the total wait.
+_MAX_RETRIES = 2
+
+# Shared clients keyed by (api_key, base_url)
+_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+
+# HTTP/2 client behind every OpenAI client, so all agents reuse its
+# connections (and multiplex requests to the same host)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the HTTP client shared by all OpenAI clients.
+    
+    Returns:
+        httpx.AsyncClient: The shared client
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=_HTTP_LIMITS,
+            timeout=_HTTP_TIMEOUT
+        )
+    return _http_client
+
+
+def _get_client(api_key: str, base_url: str) -> AsyncOpenAI:
+    """Get a shared OpenAI client for the given settings.
+    
+    Args:
+        api_key (str): OpenAI API key
+        base_url (str): OpenAI base URL
+        
+    Returns:
+        AsyncOpenAI: Client for these settings
+    """
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=_HTTP_TIMEOUT,
+            max_retries=_MAX_RETRIES,
+            http_client=_get_http_client()
+        )
+        _clients[key] = client
+    return client
+
+
+def build_history_messages(
+    history: Iterable[Message], summary: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """Convert conversation history to OpenAI messages shared by every role.
+    
+    Args:
+        history (Iterable[Message]): Conversation history, read once
+        summary (str, optional): Summary of conversation older than history
+        
+    Returns:
+        List[Dict[str, str]]: Messages to place after a role's system prompt
+    """
+    return [
+        *(
+            [{"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}]
+            if summary else []
+        ),
+        *(msg.as_chat_message() for msg in history)
+    ]
+
+
+async def close_clients() -> None:
+    """Close the shared HTTP client and forget all OpenAI clients."""
+    global _http_client
+    _clients.clear()
+    if _http_client is not None:
+        http_client, _http_client = _http_client, None
+        await http_client.aclose()
+
+
+class ResponseInterrupted(Exception):
+    """A response failed after part of it had already been streamed.
+    
+    The exception message is the error text; the streamed part is already
+    with the caller, which can keep it and report the error separately.
+    """
+
+
 class Agent:
     """Base agent class that handles OpenAI API interactions."""
     
@@ -25,15 +158,25 @@ class Agent:
         self.default_api_key = default_api_key
         self.default_base_url = default_base_url
         
-        # Initialize OpenAI client
+        # Number of recent messages this role sees verbatim
+        self.context_window = int(config.get('model', {}).get('context_window', DEFAULT_CONTEXT_WINDOW))
+        
+        # Request settings, read from the config once
+        self._model = config['model']['engine']
+        self._temperature = float(config['model'].get('temperature', 0.7))
+        self._max_tokens = int(config['model'].get('max_tokens', 300))
+        
+        # Role prompt and conversation note, sent as one system message
+        self._system_message = {
+            "role": "system",
+            "content": f"{config['prompt'].rstrip()}\n\n{_SYSTEM_CONTEXT_NOTE}"
+        }
+        
+        # Get the OpenAI client shared by agents with the same settings
         api_key, base_url = self._get_api_settings()
         # print(f"Using API key: {api_key}")
         # print(f"Using base URL: {base_url}")
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            timeout=30.0  # 30 second timeout
-        )
+        self.client = _get_client(api_key, base_url)
     
     def _get_api_settings(self) -> Tuple[str, str]:
         """Get API settings for this role.
@@ -43,71 +186,146 @@ class Agent:
         """
         model_config = self.config.get('model', {})
         
-        # Try global environment variables first
-        env_key = f"OPENAI_API_KEY"
-        env_url = f"OPENAI_BASE_URL"
-        
+        # The defaults were read from the environment once at startup
         api_key = (
             model_config.get('openai_api_key') or  # From YAML
-            os.getenv(env_key) or                  # From role-specific env
-            self.default_api_key                   # Default
+            self.default_api_key                   # From environment
         )
         
         base_url = (
             model_config.get('openai_base_url') or  # From YAML
-            os.getenv(env_url) or                   # From role-specific env
-            self.default_base_url                   # Default
+            self.default_base_url                   # From environment
         )
         
         return api_key, base_url
     
-    async def get_response(self, message: str, history: List[Message]) -> str:
+    async def get_response(
+        self, message: str, history: Iterable[Message], summary: Optional[str] = None
+    ) -> str:
         """Get a response from the agent.
         
         Args:
             message (str): User message
-            history (list[Message]): Conversation history
+            history (Iterable[Message]): Conversation history
+            summary (str, optional): Summary of conversation older than history
             
         Returns:
             str: Agent's response
         """
+        history_messages = build_history_messages(history, summary)
+        chunks = []
         try:
-            # Convert history to OpenAI message format
-            messages = [{"role": "system", "content": self.config['prompt']}]
-            
-            # Add a system message to explain the conversation format
-            messages.append({
-                "role": "system",
-                "content": "The conversation history includes context about who messages are addressed to. "
-                          "Pay attention to the conversation flow and context when responding."
-            })
+            async for chunk in self.stream_response(message, history_messages):
+                chunks.append(chunk)
+        except ResponseInterrupted as e:
+            chunks.append(f"\n\n{e}")
+        return "".join(chunks)
+    
+    def build_request(
+        self, message: str, history_messages: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Build the chat completion request body for a message.
+        
+        Args:
+            message (str): User message
+            history_messages (List[Dict[str, str]]): Conversation history as
+                built by build_history_messages(), shared between roles
             
-            # Add conversation history
-            for msg in history:
-                if msg.role == "user":
-                    messages.append({"role": "user", "content": msg.content})
-                else:
-                    messages.append({"role": "assistant", "content": msg.content})
+        Returns:
+            Dict[str, Any]: Keyword arguments for chat.completions.create
+        """
+        # Only the role prompt and the current message are per agent
+        return {
+            "model": self._model,
+            "messages": [
+                self._system_message,
+                *history_messages,
+                {"role": "user", "content": message}
+            ],
+            "temperature": self._temperature,
+            "max_tokens": self._max_tokens
+        }
+    
+    async def stream_response(
+        self, message: str, history_messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        """Stream a response from the agent.
+        
+        Args:
+            message (str): User message
+            history_messages (List[Dict[str, str]]): Conversation history as
+                built by build_history_messages(), shared between roles
             
-            # Add the current message
-            messages.append({"role": "user", "content": message})
+        Yields:
+            str: Pieces of the agent's response as they arrive, or the error
+                text if it fails before any text arrives (a failure after
+                that raises ResponseInterrupted)
+        """
+        started = False
+        try:
+            request = self.build_request(message, history_messages)
             
-            # Call OpenAI API with timeout and cancellation support
+            # The whole response, including the client's retries while
+            # opening the stream, must finish within one deadline. Once the
+            # stream is open, the first text must also arrive within a
+            # shorter one. Deadlines are only armed while waiting on the
+            # API, never while the caller holds a chunk.
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + _RESPONSE_TIMEOUT
+            wait_until = deadline
             try:
-                async with asyncio.timeout(30):  # 30 second timeout
-                    response = await self.client.chat.completions.create(
-                        model=self.config['model']['engine'],
-                        messages=messages,
-                        temperature=float(self.config['model'].get('temperature', 0.7)),
-                        max_tokens=int(self.config['model'].get('max_tokens', 300))
+                async with asyncio.timeout_at(deadline):
+                    stream = await self.client.chat.completions.create(
+                        **request,
+                        stream=True
                     )
-                    return response.choices[0].message.content
+                wait_until = min(loop.time() + _FIRST_TOKEN_TIMEOUT, deadline)
+                async with stream:
+                    chunks = aiter(stream)
+                    while True:
+                        async with asyncio.timeout_at(wait_until):
+                            chunk = await anext(chunks, None)
+                        if chunk is None:
+                            break
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            if not started:
+                                started = True
+                                wait_until = deadline
+                            yield chunk.choices[0].delta.content
             except asyncio.TimeoutError:
-                return f"Error: Response timeout after 30 seconds"
-            except asyncio.CancelledError:
-                # Make sure to close any pending HTTP connections
-                await self.client.close()
-                raise
+                error = _TIMEOUT_MESSAGE if wait_until == deadline else _FIRST_TOKEN_TIMEOUT_MESSAGE
+            else:
+                return
             
         except Exception as e:
-            return f"Error getting response from {self.role_name}: {str(e)}" 
\ No newline at end of file
+            error = f"Error getting response from {self.role_name}: {str(e)}"
+        
+        # An error after some text must not be mistaken for more of it
+        if started:
+            raise ResponseInterrupted(error)
+        yield error
+    
+    async def summarize(
+        self, messages: List[Message], previous_summary: Optional[str] = None
+    ) -> str:
+        """Summarize part of the conversation.
+        
+        Args:
+            messages (list[Message]): Messages to fold into the summary
+            previous_summary (str, optional): Summary of even older messages
+            
+        Returns:
+            str: Updated summary
+        """
+        transcript = "\n".join(msg.format_for_history() for msg in messages)
+        if previous_summary:
+            transcript = f"Earlier summary:\n{previous_summary}\n\nNew messages:\n{transcript}"
+        
+        async with asyncio.timeout(_RESPONSE_TIMEOUT):
+            response = await self.client.chat.completions.create(
+                model=self._model,
+                messages=[_SUMMARY_INSTRUCTION, {"role": "user", "content": transcript}],
+                temperature=0.3,
+                max_tokens=_SUMMARY_MAX_TOKENS
+            )
+        return response.choices[0].message.content
\ No newline at end of file
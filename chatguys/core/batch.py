@@ -0,0 +1,92 @@
+"""Batch API support for multi-role messages."""
+
+import asyncio
+from typing import Any, Dict, List
+import orjson
+from openai import AsyncOpenAI
+
+
+# Batch states after which no more results will arrive
+_FINAL_STATUSES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+
+# Polling interval bounds in seconds
+_POLL_INITIAL = 1.0
+_POLL_MAX = 30.0
+
+
+class BatchProcessor:
+    """Runs several chat completion requests as one OpenAI batch job."""
+    
+    def __init__(self, client: AsyncOpenAI):
+        """Initialize the BatchProcessor.
+        
+        Args:
+            client (AsyncOpenAI): Client for the provider that runs the batch
+        """
+        self.client = client
+    
+    async def run_batch(self, requests: List[Dict[str, Any]]) -> List[str]:
+        """Submit requests as a batch and wait for the results.
+        
+        Args:
+            requests (List[Dict[str, Any]]): Chat completion request bodies
+        
+        Returns:
+            List[str]: Response text (or an error message) for each request, in order
+        """
+        # Build and upload the JSONL input file
+        lines = [
+            orjson.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            })
+            for i, body in enumerate(requests)
+        ]
+        input_file = await self.client.files.create(
+            file=("chatguys_batch.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        # Poll with exponential backoff until the batch finishes
+        delay = _POLL_INITIAL
+        try:
+            while batch.status not in _FINAL_STATUSES:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _POLL_MAX)
+                batch = await self.client.batches.retrieve(batch.id)
+        except asyncio.CancelledError:
+            # Don't leave the job running (and billing) after a cancel
+            try:
+                await self.client.batches.cancel(batch.id)
+            except Exception:
+                pass
+            raise
+        
+        if not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+        
+        # Match results to requests by custom_id
+        output = await self.client.files.content(batch.output_file_id)
+        results: Dict[str, str] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            error = record.get('error') or (record.get('response') or {}).get('body', {}).get('error')
+            if error:
+                results[record['custom_id']] = f"Error: {error.get('message', 'request failed')}"
+            else:
+                body = record['response']['body']
+                results[record['custom_id']] = body['choices'][0]['message']['content']
+        
+        return [
+            results.get(str(i), f"Error: No result for this request in batch {batch.id}")
+            for i in range(len(requests))
+        ]
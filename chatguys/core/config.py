@@ -5,6 +5,12 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 import yaml
 
+# Prefer the libyaml-backed loader, which parses several times faster
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 class ConfigManager:
     """Manages role configurations."""
@@ -13,6 +19,20 @@ class ConfigManager:
         """Initialize the ConfigManager."""
         self.config_dir = Path.home() / ".config" / "chatguys"
         self.roles: Dict[str, Dict[str, Any]] = {}
+        
+        # Modification time of the roles file when it was last parsed
+        self._config_mtime: Optional[float] = None
+        
+        # Messages to at least this many roles go through the Batch API (0 = never)
+        self.batch_threshold = int(os.getenv("CHATGUYS_BATCH_THRESHOLD") or 0)
+        
+        # Maximum number of API requests in flight at once (see /concurrency)
+        self.max_concurrency = int(os.getenv("CHATGUYS_MAX_CONCURRENCY") or 8)
+        if self.max_concurrency < 1:
+            raise ValueError("CHATGUYS_MAX_CONCURRENCY must be at least 1")
+        
+        # Maximum number of API requests started per minute (0 = unlimited)
+        self.requests_per_minute = int(os.getenv("CHATGUYS_REQUESTS_PER_MINUTE") or 0)
         self.load_configurations()
     
     def load_configurations(self) -> None:
@@ -22,7 +42,12 @@ class ConfigManager:
         
         # Load default roles config
         default_config = self.config_dir / "default_roles.yaml"
-        if not default_config.exists():
+        try:
+            mtime = default_config.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime is None:
+            self._config_mtime = None
             # Use minimal default config
             self.roles = {
                 "Default": {
@@ -37,11 +62,17 @@ class ConfigManager:
             }
             return
         
+        # Nothing to do if the file hasn't changed since it was last parsed
+        if mtime == self._config_mtime:
+            return
+        
         try:
             with open(default_config, 'r', encoding='utf-8') as f:
-                self.roles = yaml.safe_load(f) or {}
+                self.roles = yaml.load(f, Loader=SafeLoader) or {}
+            self._config_mtime = mtime
         except Exception as e:
             print(f"Error loading configuration: {str(e)}")
+            self._config_mtime = None
             # Fall back to minimal default config
             self.roles = {
                 "Default": {
@@ -1,13 +1,58 @@
 """Context management for chat history."""
 
 import os
-import json
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, BinaryIO, Deque, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+import orjson
 from ..models.message import Message
 
 
+# Seconds to wait for more messages before writing the session files, so
+# the user message and every response of a turn are saved together
+_SAVE_DELAY = 0.05
+
+
+def _replace_file(path: Path, data: Union[str, bytes]) -> None:
+    """Replace a file's contents atomically.
+    
+    The data goes to a temporary file next to it that is then renamed over
+    it, so a crash mid-write leaves the previous contents intact.
+    
+    Args:
+        path (Path): File to replace
+        data (Union[str, bytes]): New contents; text is written as UTF-8
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    if isinstance(data, bytes):
+        tmp.write_bytes(data)
+    else:
+        tmp.write_text(data, encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _decode_lines(lines: List[bytes]) -> Tuple[List[Dict[str, Any]], bool]:
+    """Decode JSONL message lines, dropping a last line cut short by a crash.
+    
+    Args:
+        lines (List[bytes]): Non-blank lines, oldest first
+        
+    Returns:
+        Tuple[List[Dict[str, Any]], bool]: (records, whether the last line was dropped)
+    """
+    records = [orjson.loads(line) for line in lines[:-1]]
+    if lines:
+        try:
+            records.append(orjson.loads(lines[-1]))
+        except orjson.JSONDecodeError:
+            return records, True
+    return records, False
+
+
 class ContextManager:
     """Manages conversation history and context."""
     
@@ -19,20 +64,42 @@ class ContextManager:
             session_name (str, optional): Custom name for the session files
         """
         self.max_history = max_history
-        self.history: List[Message] = []
+        # Oldest messages drop off automatically once max_history is reached
+        self.history: Deque[Message] = deque(maxlen=max_history)
         self.session_start = datetime.now()
         
+        # Rolling summary of messages that fell out of the prompt window
+        self.summary: Optional[str] = None
+        self.summary_until: Optional[datetime] = None
+        
+        # Pending write-behind save: messages to append, or a full rewrite
+        self._unsaved: List[Message] = []
+        self._rewrite = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Disk writes run in order on a single background thread so they
+        # never block the event loop; the last one is kept to wait on
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chatguys-history")
+        self._last_write: Optional[Future] = None
+        
+        # Session files, kept open for appending once written to
+        self._session_fp: Optional[BinaryIO] = None
+        self._text_fp: Optional[TextIO] = None
+        
+        # Whether the session files were written to since the last export
+        self._changed = False
+        
         # Ensure cache directory exists
         self.cache_dir = Path.home() / ".cache" / "chatguys"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Set default session files
         if session_name:
-            self.session_file = self.cache_dir / f"{session_name}.json"
+            self.session_file = self.cache_dir / f"{session_name}.jsonl"
             self.text_file = self.cache_dir / f"{session_name}.txt"
         else:
             timestamp = self.session_start.strftime('%Y%m%d_%H%M%S')
-            self.session_file = self.cache_dir / f"chat_{timestamp}.json"
+            self.session_file = self.cache_dir / f"chat_{timestamp}.jsonl"
             self.text_file = self.cache_dir / f"chat_{timestamp}.txt"
     
     def add_message(self, role: str, content: str) -> None:
@@ -44,13 +111,25 @@ class ContextManager:
         """
         message = Message(role=role, content=content)
         self.history.append(message)
+        self._unsaved.append(message)
+        
+        # Save to files
+        self._schedule_save()
+    
+    def add_messages(self, messages: Iterable[Tuple[str, str]]) -> None:
+        """Add several messages to the conversation history at once.
+        
+        The history is saved once for the whole batch.
         
-        # Trim history if it exceeds max_history
-        if len(self.history) > self.max_history:
-            self.history = self.history[-self.max_history:]
+        Args:
+            messages (Iterable[Tuple[str, str]]): (role, content) pairs
+        """
+        new_messages = [Message(role=role, content=content) for role, content in messages]
+        self.history.extend(new_messages)
+        self._unsaved.extend(new_messages)
         
         # Save to files
-        self._save_history()
+        self._schedule_save()
     
     def get_history(self, last_n: Optional[int] = None) -> List[Message]:
         """Get the conversation history.
@@ -59,44 +138,188 @@ class ContextManager:
             last_n (int, optional): Number of most recent messages to return
             
         Returns:
-            List[Message]: List of messages
+            List[Message]: List of messages, oldest first
         """
         if last_n is None:
-            return self.history
-        return self.history[-last_n:]
+            return list(self.history)
+        return list(islice(self.history, max(0, len(self.history) - last_n), None))
+    
+    def get_unsummarized(self, window: int) -> List[Message]:
+        """Get messages outside the prompt window not yet covered by the summary.
+        
+        Args:
+            window (int): Number of most recent messages sent to agents verbatim
+            
+        Returns:
+            List[Message]: Messages to fold into the summary, oldest first
+        """
+        older = islice(self.history, max(0, len(self.history) - window))
+        if self.summary_until is None:
+            return list(older)
+        return [msg for msg in older if msg.timestamp > self.summary_until]
+    
+    def update_summary(self, summary: str, until: datetime) -> None:
+        """Replace the rolling summary of older messages.
+        
+        Args:
+            summary (str): Summary text
+            until (datetime): Timestamp of the newest message it covers
+        """
+        self.summary = summary
+        self.summary_until = until
     
     def clear_history(self) -> None:
         """Clear the conversation history."""
-        self.history = []
-        self._save_history()
-    
-    def _save_history(self) -> None:
-        """Save the conversation history to both JSON and text files."""
-        # Save JSON format
-        history_data = {
-            "session_start": self.session_start.isoformat(),
-            "messages": [
-                {
-                    "role": msg.role,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp.isoformat()
-                }
-                for msg in self.history
-            ]
-        }
+        was_empty = not self.history
+        self.history.clear()
+        self.summary = None
+        self.summary_until = None
         
-        with open(self.session_file, 'w', encoding='utf-8') as f:
-            json.dump(history_data, f, indent=2, ensure_ascii=False)
+        # Nothing on disk to clear if the history was already empty
+        if not was_empty:
+            self._rewrite = True
+            self.flush()
+    
+    def _schedule_save(self) -> None:
+        """Save the history shortly, coalescing messages added meanwhile."""
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to defer to, so save right away
+            self.flush()
+            return
+        self._save_handle = loop.call_later(_SAVE_DELAY, self._write_behind)
+    
+    def _write_behind(self) -> None:
+        """Hand pending changes to the writer thread without waiting."""
+        self._save_handle = None
+        self._submit_pending()
+    
+    def _submit_pending(self) -> None:
+        """Queue pending changes on the writer thread."""
+        if self._rewrite:
+            self._rewrite = False
+            self._unsaved = []
+            # Snapshot, since the history keeps changing on this thread
+            self._last_write = self._writer.submit(self._save_history, list(self.history))
+        elif self._unsaved:
+            messages, self._unsaved = self._unsaved, []
+            self._last_write = self._writer.submit(self._append_messages, messages)
+    
+    def flush(self) -> None:
+        """Write any pending changes to the session files and wait for them."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._submit_pending()
+        
+        # Writes run in order, so this waits for every earlier one as well
+        if self._last_write is not None:
+            last_write, self._last_write = self._last_write, None
+            last_write.result()
+    
+    def close(self) -> None:
+        """Write pending changes, export the JSON transcript and close the session files."""
+        self.flush()
+        self._close_files()
+        if self._changed:
+            self._changed = False
+            try:
+                self._export_json()
+            except Exception as e:
+                # The JSONL log is intact; only the convenience copy is missing
+                print(f"Error exporting session: {str(e)}")
+    
+    def _export_json(self) -> None:
+        """Write the JSONL log as one indented JSON document next to it."""
+        with open(self.session_file, 'rb') as f:
+            header = orjson.loads(f.readline())
+            messages, _ = _decode_lines([line for line in f if line.strip()])
+        _replace_file(
+            self.session_file.with_suffix('.json'),
+            orjson.dumps({**header, "messages": messages}, option=orjson.OPT_INDENT_2)
+        )
+    
+    def _close_files(self) -> None:
+        """Close the session files if they are open."""
+        for fp in (self._session_fp, self._text_fp):
+            if fp is not None:
+                fp.close()
+        self._session_fp = None
+        self._text_fp = None
+    
+    def _session_header(self) -> bytes:
+        """Encode the first line of the JSONL session file."""
+        return orjson.dumps({"session_start": self.session_start.isoformat()}) + b"\n"
+    
+    def _text_header(self) -> str:
+        """Format the first line of the plain text session file."""
+        return f"Chat session started at: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    
+    @staticmethod
+    def _encode_message(msg: Message) -> bytes:
+        """Encode a message as one JSONL line."""
+        return orjson.dumps({
+            "role": msg.role,
+            "content": msg.content,
+            "timestamp": msg.iso_ts
+        }) + b"\n"
+    
+    @staticmethod
+    def _format_text(msg: Message) -> str:
+        """Format a message for the plain text session file."""
+        if msg.role == "user":
+            return f"[{msg.formatted_ts}] You: {msg.content}\n\n"
+        return f"[{msg.formatted_ts}] {msg.role}: {msg.content}\n\n"
+    
+    def _append_messages(self, messages: List[Message]) -> None:
+        """Append messages to the session files, creating them if needed.
+        
+        Args:
+            messages (List[Message]): Messages not yet written
+        """
+        if self._session_fp is None:
+            is_new = not self.session_file.exists()
+            self._session_fp = open(self.session_file, 'ab')
+            if is_new:
+                self._session_fp.write(self._session_header())
+        if self._text_fp is None:
+            is_new = not self.text_file.exists()
+            self._text_fp = open(self.text_file, 'a', encoding='utf-8')
+            if is_new:
+                self._text_fp.write(self._text_header())
+        
+        self._session_fp.write(b"".join(self._encode_message(msg) for msg in messages))
+        self._session_fp.flush()
+        self._text_fp.write("".join(self._format_text(msg) for msg in messages))
+        self._text_fp.flush()
+        self._changed = True
+    
+    def _save_history(self, messages: Optional[List[Message]] = None) -> None:
+        """Rewrite both session files (JSONL and plain text) from the history.
+        
+        Args:
+            messages (List[Message], optional): Messages to write instead of
+                the current history
+        """
+        if messages is None:
+            messages = list(self.history)
+        self._close_files()
+        
+        # Save JSONL format: a header line, then one line per message
+        _replace_file(
+            self.session_file,
+            self._session_header() + b"".join(self._encode_message(msg) for msg in messages)
+        )
         
         # Save plain text format
-        with open(self.text_file, 'w', encoding='utf-8') as f:
-            f.write(f"Chat session started at: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            for msg in self.history:
-                timestamp = msg.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                if msg.role == "user":
-                    f.write(f"[{timestamp}] You: {msg.content}\n\n")
-                else:
-                    f.write(f"[{timestamp}] {msg.role}: {msg.content}\n\n")
+        _replace_file(
+            self.text_file,
+            self._text_header() + "".join(self._format_text(msg) for msg in messages)
+        )
+        self._changed = True
     
     def format_history(self, last_n: Optional[int] = None) -> str:
         """Format the conversation history for display.
@@ -119,16 +342,23 @@ class ContextManager:
         Returns:
             bool: True if history was loaded successfully, False otherwise
         """
+        # Write pending messages to the current session files first
+        self.flush()
+        
         # Strip extension if provided
         base_name = filename.rsplit('.', 1)[0]
-        json_file = self.cache_dir / f"{base_name}.json"
+        json_file = self.cache_dir / f"{base_name}.jsonl"
+        legacy_file = self.cache_dir / f"{base_name}.json"
         
-        # Update file paths
+        # Update file paths; they are restored if loading fails, so nothing
+        # is appended to a file that could not be read
+        self._close_files()
+        previous = (self.session_file, self.text_file, self.session_start)
         self.session_file = json_file
         self.text_file = self.cache_dir / f"{base_name}.txt"
         
         # If file doesn't exist, keep current history (if any) and save to new file
-        if not json_file.exists():
+        if not json_file.exists() and not legacy_file.exists():
             print(f"\nCreating new session: {base_name}")
             # Only save if this is a new session (no history exists)
             if not self.history:
@@ -136,39 +366,55 @@ class ContextManager:
             return True
         
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if json_file.exists():
+                # Header line, then one message per line, oldest first. Only
+                # the newest max_history can end up in the history, so the
+                # file is streamed and only those lines are parsed.
+                with open(json_file, 'rb') as f:
+                    header = orjson.loads(f.readline())
+                    lines = deque(maxlen=self.max_history)
+                    offset = f.tell()
+                    for line in f:
+                        if line.strip():
+                            lines.append((offset, line))
+                        offset += len(line)
+                records, torn = _decode_lines([line for _, line in lines])
+                needs_rewrite = False
+                
+                # A crash mid-append can leave the last line incomplete; cut
+                # it off so new messages start on a fresh line
+                if torn:
+                    os.truncate(json_file, lines[-1][0])
+                    print(f"\nDropped an incomplete last message from {json_file.name}")
+            else:
+                # Session saved as a single JSON document by older versions
+                header = orjson.loads(legacy_file.read_bytes())
+                records = header['messages']
+                needs_rewrite = True
             
             # Load session start time
-            self.session_start = datetime.fromisoformat(data['session_start'])
-            
-            # Load messages with their original timestamps
-            loaded_messages = [
-                Message(
-                    role=msg['role'],
-                    content=msg['content'],
-                    timestamp=datetime.fromisoformat(msg['timestamp'])
-                )
-                for msg in data['messages']
-            ]
+            self.session_start = datetime.fromisoformat(header['session_start'])
             
             # Merge with existing history if any
             if self.history:
+                needs_rewrite = True
                 print("\nMerging with current session...")
-                # Add loaded messages that aren't already in history
-                existing_timestamps = {msg.timestamp.isoformat() for msg in self.history}
-                for msg in loaded_messages:
-                    if msg.timestamp.isoformat() not in existing_timestamps:
-                        self.history.append(msg)
-            else:
-                self.history = loaded_messages
+                # Skip loaded messages that are already in history, comparing
+                # the stored timestamps before parsing any of them
+                existing_timestamps = {msg.iso_ts for msg in self.history}
+                records = [msg for msg in records if msg['timestamp'] not in existing_timestamps]
             
-            # Sort messages by timestamp to ensure correct order
-            self.history.sort(key=lambda x: x.timestamp)
+            # Load messages with their original timestamps
+            loaded_messages = [
+                Message.from_iso(msg['role'], msg['content'], msg['timestamp'])
+                for msg in records
+            ]
+            merged = [*self.history, *loaded_messages]
             
-            # Trim history if it exceeds max_history
-            if len(self.history) > self.max_history:
-                self.history = self.history[-self.max_history:]
+            # Sort messages by timestamp to ensure correct order; the deque
+            # keeps only the newest max_history of them
+            merged.sort(key=lambda x: x.timestamp)
+            self.history = deque(merged, maxlen=self.max_history)
             
             # Display recovery info and messages
             print(f"\nRecovered session from {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -186,9 +432,11 @@ class ContextManager:
                         print(f"\n[{msg.timestamp.strftime('%H:%M:%S')}] {msg.role}: {msg.content}")
                 print("\n" + "-" * 40 + "\n")
             
-            # Save merged history
-            self._save_history()
+            # Save merged or converted history; a plain load is already on disk
+            if needs_rewrite:
+                self._save_history()
             return True
         except Exception as e:
             print(f"Error loading session: {str(e)}")
+            self.session_file, self.text_file, self.session_start = previous
             return False 
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""Client-side request rate limiting."""
+
+import time
+import asyncio
+
+
+class RateLimiter:
+    """Token bucket that limits how many API requests start per minute.
+    
+    The bucket holds up to a minute's worth of requests and refills
+    continuously, so short bursts go through immediately while sustained
+    load is held to the configured rate.
+    """
+    
+    def __init__(self, requests_per_minute: int):
+        """Initialize the RateLimiter.
+        
+        Args:
+            requests_per_minute (int): Maximum sustained request rate
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(requests_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
@@ -1,25 +1,77 @@
 """Message model for chat history."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Dict, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Represents a single message in the conversation."""
     role: str  # The role/agent name or "user"
     content: str
     timestamp: datetime = None
+    _chat_message: Optional[Dict[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    _formatted_ts: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _iso_ts: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
     
+    @classmethod
+    def from_iso(cls, role: str, content: str, timestamp: str) -> "Message":
+        """Create a message from a stored ISO 8601 timestamp.
+        
+        The string is kept as the message's ISO timestamp, so saving the
+        message again does not need to re-format it.
+        
+        Args:
+            role (str): The role/agent name or "user"
+            content (str): Message content
+            timestamp (str): Timestamp in ISO 8601 format
+            
+        Returns:
+            Message: The message
+        """
+        message = cls(role=role, content=content, timestamp=datetime.fromisoformat(timestamp))
+        message._iso_ts = timestamp
+        return message
+    
+    @property
+    def formatted_ts(self) -> str:
+        """Timestamp as "YYYY-MM-DD HH:MM:SS", formatted once and cached."""
+        if self._formatted_ts is None:
+            self._formatted_ts = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return self._formatted_ts
+    
+    @property
+    def iso_ts(self) -> str:
+        """Timestamp in ISO 8601 format, formatted once and cached."""
+        if self._iso_ts is None:
+            self._iso_ts = self.timestamp.isoformat()
+        return self._iso_ts
+    
+    def as_chat_message(self) -> Dict[str, str]:
+        """Get the message as an OpenAI chat message.
+        
+        Built on first use and reused for every later request, so each
+        message is converted once however many turns and roles send it.
+        
+        Returns:
+            Dict[str, str]: Message with "role" and "content"
+        """
+        if self._chat_message is None:
+            self._chat_message = {
+                "role": "user" if self.role == "user" else "assistant",
+                "content": self.content
+            }
+        return self._chat_message
+    
     def format_for_history(self) -> str:
         """Format the message for history display.
         
         Returns:
             str: Formatted message
         """
-        timestamp = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        return f"[{timestamp}] {self.role}: {self.content}" 
\ No newline at end of file
+        return f"[{self.formatted_ts}] {self.role}: {self.content}" 
\ No newline at end of file
@@ -5,6 +5,10 @@ from typing import List
 from prompt_toolkit.completion import WordCompleter
 
 
+# Trigger completion on words starting with @ or /
+_COMPLETER_TRIGGER_RE = re.compile(r'^(@\w*|/\w*)$')
+
+
 def create_role_completer(roles: List[str]) -> WordCompleter:
     """Create a completer for role names.
     
@@ -50,5 +54,5 @@ def create_combined_completer(roles: List[str], commands: List[str]) -> WordComp
     return WordCompleter(
         completions,
         ignore_case=True,
-        pattern=re.compile(r'^(@\w*|/\w*)$')  # Trigger on @ or /
+        pattern=_COMPLETER_TRIGGER_RE
     ) 
\ No newline at end of file
@@ -4,6 +4,10 @@ import re
 from typing import List, Tuple, Optional
 
 
+# Pattern for @Role mentions
+_ROLE_RE = re.compile(r'@(\w+)')
+
+
 def extract_mentions(message: str) -> List[Tuple[str, str]]:
     """Extract all role mentions and their associated messages from text.
     
@@ -22,89 +26,43 @@ def extract_mentions(message: str) -> List[Tuple[str, str]]:
     if not message:
         return []
     
+    # Most messages mention no one, which needs no regex scan
+    if '@' not in message:
+        return [("Default", message)]
+    
     # Look for all @Role patterns in the message
-    role_pattern = r'@(\w+)'
-    matches = list(re.finditer(role_pattern, message))
+    matches = list(_ROLE_RE.finditer(message))
     
     if not matches:
         # If no roles found and message is not empty, use Default
         return [("Default", message)] if message else []
     
-    # Check if mentions are tightly grouped (only whitespace between them)
-    def are_mentions_grouped(matches_subset):
-        if len(matches_subset) <= 1:
-            return True
-        for i in range(len(matches_subset) - 1):
-            curr_end = matches_subset[i].span()[1]
-            next_start = matches_subset[i + 1].span()[0]
-            if not message[curr_end:next_start].isspace():
-                return False
-        return True
-    
-    # Check if all mentions are at the start
-    first_match_start = matches[0].span()[0]
-    prefix = message[:first_match_start].strip()
-    start_mentions = []
-    for match in matches:
-        if match.span()[0] < len(prefix) + len(" ".join(m.group(0) for m in start_mentions)):
-            start_mentions.append(match)
-        else:
-            break
-    
-    # Check if all mentions are at the end
-    last_match_end = matches[-1].span()[1]
-    suffix = message[last_match_end:].strip()
-    end_mentions = []
-    for match in reversed(matches):
-        if match.span()[1] > len(message) - len(suffix) - len(" ".join(m.group(0) for m in end_mentions)):
-            end_mentions.insert(0, match)
-        else:
-            break
-    
-    # Determine if this is a shared message case
-    is_shared_message = (
-        # All mentions at start
-        (len(start_mentions) == len(matches) and not prefix) or
-        # All mentions at end
-        (len(end_mentions) == len(matches) and not suffix) or
-        # All mentions are tightly grouped somewhere in the message
-        are_mentions_grouped(matches)
+    # Mentions separated only by whitespace share the text around them;
+    # with mentions at the start or end, that is all the text after or before
+    is_shared_message = all(
+        message[prev.end():match.start()].isspace()
+        for prev, match in zip(matches, matches[1:])
     )
     
     if is_shared_message:
-        # For mentions at start, use everything after
-        if len(start_mentions) == len(matches):
-            content = message[matches[-1].span()[1]:].strip()
-        # For mentions at end, use everything before
-        elif len(end_mentions) == len(matches):
-            content = message[:matches[0].span()[0]].strip()
-        # For grouped mentions in middle, split and use the longer content
-        else:
-            before = message[:matches[0].span()[0]].strip()
-            after = message[matches[-1].span()[1]:].strip()
-            content = after if len(after) > len(before) else before
-            
+        # Use the longer of the text before and after the mentions
+        before = message[:matches[0].start()].strip()
+        after = message[matches[-1].end():].strip()
+        content = after if len(after) > len(before) else before
+        
         if not content:
             return []
         return [(match.group(1), content) for match in matches]
     else:
-        # Role-specific messages case
+        # Role-specific messages case: each mention owns the text up to the next one
         segments = []
-        for i, match in enumerate(matches):
-            role_name = match.group(1)
-            start, end = match.span()
-            
-            # Get text until next mention or end of message
-            if i < len(matches) - 1:
-                next_start = matches[i + 1].span()[0]
-                content = message[end:next_start].strip()
-            else:
-                content = message[end:].strip()
-            
-            if content:
-                segments.append((role_name, content))
+        prev = matches[0]
+        for match in matches[1:]:
+            segments.append((prev.group(1), message[prev.end():match.start()].strip()))
+            prev = match
+        segments.append((prev.group(1), message[prev.end():].strip()))
         
-        return segments
+        return [(role_name, content) for role_name, content in segments if content]
 
 
 def format_role_message(role: str, message: str) -> str: